@@ -0,0 +1,108 @@
+"""Micro-benchmark for response encoding on a 30-file batch.
+
+Compares stdlib json (what JSONResponse uses) against orjson, and the bytes
+on the wire for each supported encoding, with and without a `fields=`
+projection. Run with: python bench_responses.py
+"""
+import json
+import random
+import timeit
+
+from response_encoding import ENCODERS, project_fields
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BATCH_SIZE = 30
+PDF_EVERY = 3
+ROUNDS = 200
+
+WORDS = (
+    "design layout hierarchy contrast typography spacing navigation accessibility "
+    "button form header footer colour brand user flow conversion onboarding checkout "
+    "dashboard modal grid card icon label error state responsive mobile desktop"
+).split()
+
+
+def fake_text(rng, words):
+    # Seeded word salad so compression ratios are not flattered by repetition
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_batch():
+    """Return matching (upload_images, analyze_images) item lists."""
+    rng = random.Random(0)
+    uploaded, analysis = [], []
+    for i in range(BATCH_SIZE):
+        is_pdf = i % PDF_EVERY == 0
+        image_info = {
+            "image_url": f"http://res.cloudinary.com/demo/image/upload/v1700000000/{i:032x}.png",
+            "image_name": f"design-{i}.pdf" if is_pdf else f"design-{i}.png",
+            "file_type": "pdf" if is_pdf else "image",
+        }
+        if is_pdf:
+            image_info["pdf_text"] = fake_text(rng, 6000)
+        uploaded.append(image_info)
+        analysis.append({
+            "response": fake_text(rng, 600),
+            "status": "success",
+            "image_name": image_info["image_name"],
+            "image_url": image_info["image_url"],
+            "file_type": image_info["file_type"],
+        })
+    return uploaded, analysis
+
+
+def stdlib_dumps(content):
+    # Mirrors starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def time_ms(fn, content):
+    return timeit.timeit(lambda: fn(content), number=ROUNDS) / ROUNDS * 1000
+
+
+def main():
+    uploaded, analysis = build_batch()
+    variants = {
+        "upload-images": {"images": uploaded, "status": "success"},
+        "upload-images?fields=image_url,file_type": {
+            "images": project_fields(uploaded, {"image_url", "file_type"}),
+            "status": "success",
+        },
+        "analyze-images": analysis,
+        "analyze-images?fields=response,status": project_fields(analysis, {"response", "status"}),
+    }
+
+    print(f"Batch of {BATCH_SIZE} files ({BATCH_SIZE // PDF_EVERY} PDFs), {ROUNDS} rounds\n")
+    print("Serialization (ms per response)")
+    for name, content in variants.items():
+        line = f"  {name:<42} json {time_ms(stdlib_dumps, content):8.3f}"
+        if orjson is not None:
+            line += f"   orjson {time_ms(orjson.dumps, content):8.3f}"
+        print(line)
+
+    print("\nBytes on the wire (in server preference order, size and CPU relative to gzip)")
+    for name, content in variants.items():
+        body = stdlib_dumps(content)
+        print(f"  {name:<42} identity {len(body):>9,}")
+        results = {}
+        for encoding, encode in ENCODERS.items():
+            ms = timeit.timeit(lambda: encode(body), number=10) / 10 * 1000
+            results[encoding] = (len(encode(body)), ms)
+        gzip_size, gzip_ms = results["gzip"]
+        for encoding, (size, ms) in results.items():
+            print(
+                f"  {'':<42} {encoding:<8} {size:>9,}  ({ms:.2f} ms)"
+                f"  {size / gzip_size:6.0%} bytes {ms / gzip_ms:6.0%} cpu"
+            )
+    print(
+        "\nNote: zstd and br are preferred for their lower CPU cost, not size; "
+        "see the ENCODERS comment in response_encoding.py."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-from fastapi import FastAPI, Form, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Form, HTTPException, UploadFile, File, Query
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from groq import Groq
 from dotenv import load_dotenv
@@ -9,7 +9,9 @@ import os
 import base64
 import io
 import PyPDF2
-from typing import List
+from typing import List, Optional
+
+from response_encoding import CompressionMiddleware, parse_fields, project_fields
 
 from pydantic import BaseModel
 from typing import List
@@ -29,8 +31,12 @@ class AnalysisRequest(BaseModel):
 class RefinePersonaRequest(BaseModel):
     initial_prompt: str
 
+# Keys each endpoint may return per item, selectable with `fields=`
+UPLOAD_FIELDS = ("image_url", "image_name", "file_type", "pdf_text")
+ANALYSIS_FIELDS = ("response", "status", "image_name", "image_url", "file_type")
 
-app = FastAPI()
+
+app = FastAPI(default_response_class=ORJSONResponse)
 load_dotenv()
 
 # Configure Cloudinary
@@ -49,6 +55,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (zstd/br/gzip, negotiated per request) above 1 KB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Initialize Groq client
 client = Groq(api_key=os.getenv('GROQ_API_KEY'))
 
@@ -159,14 +168,28 @@ async def refine_persona(request: RefinePersonaRequest):
 
         refined_prompt = completion.choices[0].message.content
 
-        return JSONResponse(content={"refined_prompt": refined_prompt, "status": "success"})
+        return ORJSONResponse(content={"refined_prompt": refined_prompt, "status": "success"})
 
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": str(e), "status": "error"})
+        return ORJSONResponse(status_code=500, content={"error": str(e), "status": "error"})
 
 
 @app.post("/upload-images")
-async def upload_images(images: list[UploadFile] = File(...)):
+async def upload_images(
+    images: list[UploadFile] = File(...),
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma-separated keys to keep per image (image_url, image_name, file_type, pdf_text). "
+            "Keep pdf_text if the results will be sent to /analyze-images, which reads ImageInfo.pdf_text."
+        ),
+    ),
+):
+    try:
+        wanted_fields = parse_fields(fields, UPLOAD_FIELDS)
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"error": str(e), "status": "error"})
+
     try:
         uploaded_images = []
         for image in images:
@@ -221,15 +244,26 @@ async def upload_images(images: list[UploadFile] = File(...)):
                 
             uploaded_images.append(image_info)
         
-        return JSONResponse(content={"images": uploaded_images, "status": "success"})
+        return ORJSONResponse(content={"images": project_fields(uploaded_images, wanted_fields), "status": "success"})
 
     except HTTPException as http_err:
-        return JSONResponse(status_code=http_err.status_code, content={"error": http_err.detail, "status": "error"})
+        return ORJSONResponse(status_code=http_err.status_code, content={"error": http_err.detail, "status": "error"})
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": f"Internal server error: {str(e)}", "status": "error"})
+        return ORJSONResponse(status_code=500, content={"error": f"Internal server error: {str(e)}", "status": "error"})
 
 @app.post("/analyze-images")
-async def analyze_images(request: AnalysisRequest):
+async def analyze_images(
+    request: AnalysisRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated keys to keep per result (response, status, image_name, image_url, file_type).",
+    ),
+):
+    try:
+        wanted_fields = parse_fields(fields, ANALYSIS_FIELDS)
+    except ValueError as e:
+        return ORJSONResponse(status_code=400, content={"response": str(e), "status": "error"})
+
     try:
         analysis = []
         base_prompt = f"""Adopt this professional persona:
@@ -370,9 +404,9 @@ async def analyze_images(request: AnalysisRequest):
                 "file_type": image.file_type
             })
         
-        return JSONResponse(content=analysis)
+        return ORJSONResponse(content=project_fields(analysis, wanted_fields))
     except Exception as e:
-        return JSONResponse(status_code=500, content={"response": f"Internal server error: {str(e)}", "status": "error"})
+        return ORJSONResponse(status_code=500, content={"response": f"Internal server error: {str(e)}", "status": "error"})
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,197 @@
+import gzip
+from typing import Iterable, List, Optional, Set
+
+import anyio.to_thread
+
+# Brotli and zstd are optional; gzip is always available from the stdlib
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6)
+
+def _brotli(body: bytes) -> bytes:
+    # Quality 4 keeps latency low for per-request (dynamic) compression
+    return brotli.compress(body, quality=4)
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(body)
+
+
+# Supported encodings in server preference order (used to break q-value ties).
+# The order favours CPU over bytes: on the 30-file batch in bench_responses.py,
+# zstd-3 is over 10x and br-4 3-5x cheaper than gzip-6, but their output is
+# 23% and ~40% larger. Matching gzip-6 on size needs zstd-12 or br-9, which
+# cost as much CPU as gzip-6 or more. Clients that give gzip the highest
+# q-value get the smallest body; everyone else gets the cheapest one.
+ENCODERS = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _zstd
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+ENCODERS["gzip"] = _gzip
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def _with_vary(headers: list) -> list:
+    """Return `headers` with Accept-Encoding merged into Vary exactly once."""
+    vary = None
+    rest = []
+    for name, value in headers:
+        if name == b"vary":
+            vary = value
+        else:
+            rest.append((name, value))
+    if vary is None:
+        vary = b"Accept-Encoding"
+    elif b"accept-encoding" not in [token.strip().lower() for token in vary.split(b",")]:
+        vary = vary + b", Accept-Encoding"
+    rest.append((b"vary", vary))
+    return rest
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header value."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, *params = part.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+                break
+        # Clamp to the 0-1 range from RFC 9110; NaN compares false and becomes 0
+        weights[token] = min(q, 1.0) if q > 0.0 else 0.0
+
+    best, best_q = None, 0.0
+    for name in ENCODERS:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Parse a comma-separated `fields` value, rejecting names not in `allowed`.
+
+    Returns None when `fields` is unset so callers keep the full response shape.
+    Raises ValueError listing any unknown names, or when no names are given.
+    """
+    if not fields:
+        return None
+    wanted = {field.strip() for field in fields.split(",") if field.strip()}
+    if not wanted:
+        raise ValueError(f"No fields given. Allowed: {', '.join(sorted(allowed))}")
+    unknown = sorted(wanted - set(allowed))
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    return wanted
+
+
+def project_fields(items: List[dict], wanted: Optional[Set[str]]) -> List[dict]:
+    """Keep only the `wanted` keys in each item; no-op when unset."""
+    if wanted is None:
+        return items
+    return [{key: value for key, value in item.items() if key in wanted} for item in items]
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses responses with gzip, brotli or zstd.
+
+    The encoding is negotiated from the request's Accept-Encoding header and
+    only applied to compressible bodies of at least `minimum_size` bytes.
+    Bodies of `threadpool_min_size` bytes or more are compressed in a worker
+    thread so large batches don't stall the event loop.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, threadpool_min_size: int = 64 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.threadpool_min_size = threadpool_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            # Identity was still chosen from Accept-Encoding, so caches must vary on it
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": _with_vary(message["headers"])}
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        body = []
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._send_buffered(send, start_message, b"".join(body), encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_buffered(self, send, start_message, body, encoding):
+        headers = [
+            (name, value) for name, value in start_message["headers"]
+            if name != b"content-length"
+        ]
+        header_names = {name for name, _ in headers}
+        content_type = dict(headers).get(b"content-type", b"").decode("latin-1")
+
+        should_compress = (
+            len(body) >= self.minimum_size
+            and b"content-encoding" not in header_names
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+        if should_compress:
+            encode = ENCODERS[encoding]
+            if len(body) >= self.threadpool_min_size:
+                body = await anyio.to_thread.run_sync(encode, body)
+            else:
+                body = encode(body)
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        headers = _with_vary(headers)
+
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
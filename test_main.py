@@ -0,0 +1,143 @@
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfWriter
+from starlette.responses import JSONResponse
+
+# main.py builds the Groq client at import time
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+import main  # noqa: E402
+
+ANALYSIS_TEXT = "[✔] **Strengths**:\n- I recommend a clearer call-to-action."
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Stub Cloudinary and Groq, recording every outbound call."""
+    calls = []
+
+    def upload(file):
+        calls.append("cloudinary")
+        return {"url": f"http://res.cloudinary.com/demo/{len(calls)}.png"}
+
+    def create(**kwargs):
+        calls.append("groq")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ANALYSIS_TEXT))])
+
+    monkeypatch.setattr(main.cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(main.client.chat.completions, "create", create)
+    return calls
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def pdf_bytes():
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def upload_files():
+    return [
+        ("images", ("Design.PNG", b"\x89PNG fake", "image/png")),
+        ("images", ("brief.pdf", pdf_bytes(), "application/pdf")),
+    ]
+
+
+ANALYSIS_REQUEST = {
+    "image_urls": [
+        {"image_url": "http://res.cloudinary.com/demo/1.png", "image_name": "design.png"},
+        {"image_url": "http://res.cloudinary.com/demo/2.png", "image_name": "brief.pdf",
+         "file_type": "pdf", "pdf_text": "Heading\n\nBody"},
+    ],
+    "question": "Is the hierarchy clear?",
+    "admin_persona": "",
+}
+
+
+# /upload-images
+
+def test_upload_default_shape_is_unchanged(client, calls):
+    response = client.post("/upload-images", files=upload_files())
+
+    assert response.status_code == 200
+    expected = {
+        "images": [
+            {"image_url": "http://res.cloudinary.com/demo/1.png", "image_name": "design.png", "file_type": "image"},
+            {"image_url": "http://res.cloudinary.com/demo/2.png", "image_name": "brief.pdf", "file_type": "pdf",
+             "pdf_text": "\n\n"},
+        ],
+        "status": "success",
+    }
+    # Byte-for-byte what the previous JSONResponse would have sent
+    assert response.content == JSONResponse(content=expected).body
+
+
+def test_upload_projects_fields(client, calls):
+    response = client.post("/upload-images?fields=image_url,file_type", files=upload_files())
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "images": [
+            {"image_url": "http://res.cloudinary.com/demo/1.png", "file_type": "image"},
+            {"image_url": "http://res.cloudinary.com/demo/2.png", "file_type": "pdf"},
+        ],
+        "status": "success",
+    }
+
+
+@pytest.mark.parametrize("fields", ["imageurl", "image_url,response", ","])
+def test_upload_rejects_bad_fields_before_uploading(client, calls, fields):
+    response = client.post("/upload-images", params={"fields": fields}, files=upload_files())
+
+    assert response.status_code == 400
+    body = response.json()
+    assert body["status"] == "error"
+    assert "Allowed: file_type, image_name, image_url, pdf_text" in body["error"]
+    assert calls == []
+
+
+# /analyze-images
+
+def test_analyze_default_shape_is_unchanged(client, calls):
+    response = client.post("/analyze-images", json=ANALYSIS_REQUEST)
+
+    assert response.status_code == 200
+    expected = [
+        {"response": ANALYSIS_TEXT, "status": "success", "image_name": "design.png",
+         "image_url": "http://res.cloudinary.com/demo/1.png", "file_type": "image"},
+        {"response": ANALYSIS_TEXT, "status": "success", "image_name": "brief.pdf",
+         "image_url": "http://res.cloudinary.com/demo/2.png", "file_type": "pdf"},
+    ]
+    assert response.content == JSONResponse(content=expected).body
+    assert calls == ["groq", "groq"]
+
+
+def test_analyze_projects_fields(client, calls):
+    response = client.post("/analyze-images?fields=response,image_name", json=ANALYSIS_REQUEST)
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"response": ANALYSIS_TEXT, "image_name": "design.png"},
+        {"response": ANALYSIS_TEXT, "image_name": "brief.pdf"},
+    ]
+
+
+@pytest.mark.parametrize("fields", ["responses", "response,pdf_text", " , "])
+def test_analyze_rejects_bad_fields_before_calling_model(client, calls, fields):
+    response = client.post("/analyze-images", params={"fields": fields}, json=ANALYSIS_REQUEST)
+
+    assert response.status_code == 400
+    body = response.json()
+    assert body["status"] == "error"
+    assert "Allowed: file_type, image_name, image_url, response, status" in body["response"]
+    assert calls == []
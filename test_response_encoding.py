@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+
+import pytest
+
+from response_encoding import ENCODERS, CompressionMiddleware, negotiate_encoding, parse_fields, project_fields
+
+JSON = b"application/json"
+
+
+def make_app(body, content_type=JSON, extra_headers=(), chunks=1):
+    """Fake ASGI app that sends `body` split into `chunks` body messages."""
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+        headers.extend(extra_headers)
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        size = -(-len(body) // chunks)
+        for i in range(chunks):
+            await send({
+                "type": "http.response.body",
+                "body": body[i * size:(i + 1) * size],
+                "more_body": i < chunks - 1,
+            })
+    return app
+
+
+def run(app, accept_encoding=b"gzip", **options):
+    """Drive the middleware once and return (headers dict, joined body, messages)."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding)]}
+    asyncio.run(CompressionMiddleware(app, **options)(scope, None, send))
+    headers = dict(messages[0]["headers"])
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return headers, body, messages
+
+
+requires_all_encoders = pytest.mark.skipif(
+    not {"zstd", "br"} <= set(ENCODERS), reason="brotli and zstandard are optional"
+)
+
+BODY = b'{"response":"' + b"design feedback " * 200 + b'"}'
+
+
+# negotiate_encoding
+
+@requires_all_encoders
+def test_negotiate_prefers_server_order_on_tie():
+    assert negotiate_encoding("gzip, br, zstd") == "zstd"
+    assert negotiate_encoding("gzip, br") == "br"
+
+
+@requires_all_encoders
+def test_negotiate_honours_q_values():
+    assert negotiate_encoding("zstd;q=0.5, gzip;q=0.9") == "gzip"
+
+
+@requires_all_encoders
+def test_negotiate_q_zero_excludes():
+    assert negotiate_encoding("zstd;q=0, br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+
+
+@requires_all_encoders
+def test_negotiate_q_zero_after_other_params():
+    assert negotiate_encoding("gzip;q=1;x, br;level=1;q=0") == "gzip"
+    assert negotiate_encoding("zstd;level=3 ; Q=0, gzip") == "gzip"
+
+
+@requires_all_encoders
+def test_negotiate_clamps_q_values():
+    # q=5 and q=inf clamp to 1, so the server-preference tie-break still applies
+    assert negotiate_encoding("gzip;q=5, zstd") == "zstd"
+    assert negotiate_encoding("gzip;q=inf, br;q=1") == "br"
+    assert negotiate_encoding("zstd;q=-1, br;q=nan, gzip;q=0.1") == "gzip"
+
+
+@requires_all_encoders
+def test_negotiate_wildcard():
+    assert negotiate_encoding("*") == "zstd"
+    assert negotiate_encoding("*, zstd;q=0") == "br"
+
+
+def test_negotiate_identity_and_empty():
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_negotiate_is_case_insensitive():
+    assert negotiate_encoding("GZIP") == "gzip"
+
+
+@requires_all_encoders
+def test_negotiate_bad_q_value_excludes():
+    assert negotiate_encoding("zstd;q=abc, gzip") == "gzip"
+
+
+# parse_fields / project_fields
+
+def test_default_fields_keep_response_unchanged():
+    items = [{"image_url": "u", "image_name": "n", "pdf_text": "t"}]
+    wanted = parse_fields(None, ("image_url", "image_name", "pdf_text"))
+    assert wanted is None
+    assert project_fields(items, wanted) is items
+
+
+def test_fields_projection():
+    items = [{"image_url": "u", "image_name": "n", "pdf_text": "t"}]
+    wanted = parse_fields(" image_url ,pdf_text", ("image_url", "image_name", "pdf_text"))
+    assert project_fields(items, wanted) == [{"image_url": "u", "pdf_text": "t"}]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="imageurl"):
+        parse_fields("imageurl,image_name", ("image_url", "image_name"))
+
+
+@pytest.mark.parametrize("fields", [",", " ", " , ,"])
+def test_blank_fields_are_rejected(fields):
+    with pytest.raises(ValueError, match="No fields given"):
+        parse_fields(fields, ("image_url", "image_name"))
+
+
+# CompressionMiddleware
+
+def test_compresses_body_split_over_chunks():
+    headers, body, messages = run(make_app(BODY, chunks=4))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert gzip.decompress(body) == BODY
+    assert len(messages) == 2
+
+
+def test_compresses_in_threadpool_above_cutoff():
+    headers, body, _ = run(make_app(BODY), threadpool_min_size=0)
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(body) == BODY
+
+
+def test_merges_existing_vary():
+    headers, _, _ = run(make_app(BODY, extra_headers=[(b"vary", b"Origin")]))
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+
+
+def test_does_not_duplicate_vary():
+    headers, _, _ = run(make_app(BODY, extra_headers=[(b"vary", b"accept-encoding")]))
+    assert headers[b"vary"] == b"accept-encoding"
+
+
+def test_identity_response_still_varies():
+    headers, body, _ = run(make_app(BODY, chunks=3), accept_encoding=b"identity")
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert body == BODY
+
+
+def test_skips_already_encoded_body():
+    headers, body, _ = run(make_app(BODY, extra_headers=[(b"content-encoding", b"br")]))
+    assert headers[b"content-encoding"] == b"br"
+    assert body == BODY
+
+
+def test_skips_non_compressible_type():
+    headers, body, _ = run(make_app(BODY, content_type=b"image/png"))
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert body == BODY
+
+
+def test_skips_body_below_threshold():
+    small = b'{"status":"success"}'
+    headers, body, _ = run(make_app(small))
+    assert b"content-encoding" not in headers
+    assert headers[b"content-length"] == str(len(small)).encode()
+    assert body == small